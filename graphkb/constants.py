@@ -4,6 +4,9 @@ from typing import Dict
 from .types import CategoryBaseTermMapping
 
 DEFAULT_LIMIT = 1000
+MAX_CONCURRENT_REQUESTS = 16  # also the size of the http connection pool
+DEFAULT_MAX_WORKERS = 4  # concurrent lookups by default, kept low to avoid rate limiting
+MIN_COMPRESSED_REQUEST_SIZE = 1024  # bytes, smaller request bodies are not worth compressing
 GKB_BASE_URL = "https://graphkb-api.bcgsc.ca/api"
 GKB_STAGING_URL = "https://graphkbstaging-api.bcgsc.ca/api"
 GKB_DEV_URL = "https://graphkbdev-api.bcgsc.ca/api"
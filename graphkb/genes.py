@@ -1,4 +1,5 @@
 """Methods for retrieving gene annotation lists from GraphKB."""
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Sequence, Set, Tuple, cast
 
 from . import GraphKBConnection
@@ -6,8 +7,10 @@ from .constants import (
     BASE_THERAPEUTIC_TERMS,
     CANCER_GENE,
     CHROMOSOMES,
+    DEFAULT_MAX_WORKERS,
     FAILED_REVIEW_STATUS,
     GENE_RETURN_PROPERTIES,
+    MAX_CONCURRENT_REQUESTS,
     ONCOGENE,
     ONCOKB_SOURCE_NAME,
     PHARMACOGENOMIC_SOURCE_EXCLUDE_LIST,
@@ -99,7 +102,7 @@ def get_therapeutic_associated_genes(graphkb_conn: GraphKBConnection) -> List[On
     statements = graphkb_conn.query(
         {
             "target": "Statement",
-            "filters": {"relevance": sorted(list(therapeutic_relevance))},
+            "filters": {"relevance": sorted(therapeutic_relevance)},
             "returnProperties": ["reviewStatus"]
             + [f"conditions.{prop}" for prop in GENE_RETURN_PROPERTIES]
             + [
@@ -123,9 +126,11 @@ def get_therapeutic_associated_genes(graphkb_conn: GraphKBConnection) -> List[On
                 if cond["reference2"] and cond["reference2"]["@class"] == "Feature":
                     genes.append(cond["reference2"])
     unique_genes: List[Ontology] = []
+    unique_gene_rids: Set[str] = set()
     for gene in genes:
         if not gene.get("deprecated", False):
-            if gene["@rid"] not in [g["@rid"] for g in unique_genes]:
+            if gene["@rid"] not in unique_gene_rids:
+                unique_gene_rids.add(gene["@rid"])
                 unique_genes.append(gene)
     return unique_genes
 
@@ -386,7 +391,9 @@ def convert_to_rid_set(records: Sequence[Dict]) -> Set[str]:
 
 
 def get_gene_information(
-    graphkb_conn: GraphKBConnection, gene_names: Sequence[str]
+    graphkb_conn: GraphKBConnection,
+    gene_names: Sequence[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> List[Dict[str, bool]]:
     """Create a list of gene_info flag dicts for IPR report upload.
 
@@ -400,6 +407,8 @@ def get_gene_information(
     Args:
         graphkb_conn ([type]): [description]
         gene_names ([type]): [description]
+        max_workers: number of genes to look up concurrently, 1 looks them up one at a time.
+                     At most MAX_CONCURRENT_REQUESTS (the size of the connection pool)
     Returns:
         List of gene_info dicts of form [{'name':<gene_str>, <flag>: True}]
         Keys of False values are simply omitted from ipr upload to reduce info transfer.
@@ -454,10 +463,20 @@ def get_gene_information(
         get_therapeutic_associated_genes(graphkb_conn)
     )
 
+    def equivalent_rids(gene_name: str) -> Set[str]:
+        return convert_to_rid_set(get_equivalent_features(graphkb_conn, gene_name))
+
     logger.info(f"Setting gene_info flags on {len(gene_names)} genes")
+    max_workers = min(max_workers, MAX_CONCURRENT_REQUESTS)
+    if max_workers > 1:
+        # the equivalent feature lookups are independent so run them concurrently
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            equivalents = list(executor.map(equivalent_rids, gene_names))
+    else:
+        equivalents = [equivalent_rids(gene_name) for gene_name in gene_names]
+
     result = []
-    for gene_name in gene_names:
-        equivalent = convert_to_rid_set(get_equivalent_features(graphkb_conn, gene_name))
+    for gene_name, equivalent in zip(gene_names, equivalents):
         row = {"name": gene_name}
         flagged = False
         for flag in gene_flags:
@@ -1,7 +1,7 @@
 """
 Functions which return Variants from GraphKB which match some input variant definition
 """
-from typing import Dict, List, Optional, Set, Union, cast
+from typing import AbstractSet, Dict, FrozenSet, List, Optional, Set, Union, cast
 
 from . import GraphKBConnection
 from .constants import (
@@ -25,6 +25,7 @@ from .util import (
 from .vocab import get_equivalent_terms, get_terms_set, get_term_tree
 
 FEATURES_CACHE: Set[str] = set()
+STRUCTURAL_VARIANT_TYPE_NAMES: FrozenSet[str] = frozenset(STRUCTURAL_VARIANT_TYPES)
 
 
 def get_equivalent_features(
@@ -155,7 +156,7 @@ def match_category_variant(
 
     # get the list of terms that we should match
     terms = convert_to_rid_list(
-        get_term_tree(conn, category, root_exclude_term, ignore_cache=ignore_cache)
+        get_term_tree(conn, category, root_exclude_term, ignore_cache=ignore_cache, minimal=True)
     )
 
     if not terms:
@@ -414,21 +415,21 @@ def type_screening(
         type_screening(conn, {'type': 'substitution'}) -> 'substitution'
     """
     default_type = DEFAULT_NON_STRUCTURAL_VARIANT_TYPE
-    structuralVariantTypes = STRUCTURAL_VARIANT_TYPES
+    structuralVariantTypes: AbstractSet[str] = STRUCTURAL_VARIANT_TYPE_NAMES
     threshold = STRUCTURAL_VARIANT_SIZE_THRESHOLD
 
     # Will use either hardcoded type list or an updated list from the API
     if updateStructuralTypes:
         rids = list(get_terms_set(conn, ['structural variant']))
         records = conn.get_records_by_id(rids)
-        structuralVariantTypes = [el['name'] for el in records]
+        structuralVariantTypes = {el['name'] for el in records}
 
     # Unambiguous non-structural variation type
     if parsed['type'] not in structuralVariantTypes:
         return parsed['type']
 
     # Unambiguous structural variation type
-    if parsed['type'] in ['fusion', 'translocation']:
+    if parsed['type'] in {'fusion', 'translocation'}:
         return parsed['type']
     if parsed.get('reference2', None):
         return parsed['type']
@@ -438,7 +439,7 @@ def type_screening(
 
     # When size cannot be determined: exonic and intronic coordinates
     # e.g. "MET:e.14del" meaning "Any deletion occuring at the 14th exon"
-    if prefix in ['e', 'i']:  # Assuming they don't meet the size threshold
+    if prefix in {'e', 'i'}:  # Assuming they don't meet the size threshold
         return default_type
 
     # When size is given
@@ -467,6 +468,7 @@ def match_positional_variant(
     gene_source: str = "",
     ignore_cache: bool = False,
     updateStructuralTypes: bool = False,
+    parsed: Optional[ParsedVariant] = None,
 ) -> List[Variant]:
     """
     Given the HGVS+ representation of some positional variant, parse it and match it to
@@ -481,6 +483,13 @@ def match_positional_variant(
                            as sourceIds not names
         updateStructuralTypes: Whether or not updating the structural variant list
                                with an API call, or use the hard-coded one
+        ignore_cache: match again even if the matches for these arguments are cached
+        parsed: the variant_string already parsed by the API (conn.parse), skips parsing it again.
+                The matches are not cached in this case since they depend on the given parse
+
+    Note:
+        The matches are kept in conn.cache, which is the process-wide QUERY_CACHE unless the
+        connection was created with use_global_cache=False. That cache is never evicted.
 
     Raises:
         NotImplementedError: thrown for uncertain position input (ranges)
@@ -508,8 +517,26 @@ def match_positional_variant(
     Example:
         match_positional_variant(conn, 'p.G12D', 'KRAS')
     """
+    cache_key = (
+        "positional_variant_matches",
+        variant_string,
+        reference1,
+        reference2,
+        gene_is_source_id,
+        gene_source,
+        updateStructuralTypes,
+    )
+    # the key only describes the input string so it does not hold for a pre-parsed variant
+    use_match_cache = not ignore_cache and parsed is None
+    if use_match_cache and cache_key in conn.cache:
+        # a new list each call so callers cannot change the cached matches
+        return list(conn.cache[cache_key])
+
     # parse the representation
-    parsed = conn.parse(variant_string, not (reference1 or reference2))
+    if parsed is None:
+        parsed = conn.parse(
+            variant_string, not (reference1 or reference2), ignore_cache=ignore_cache
+        )
 
     if "break1End" in parsed or "break2End" in parsed:  # uncertain position
         raise NotImplementedError(
@@ -624,6 +651,7 @@ def match_positional_variant(
         screened_type,
         root_exclude_term="mutation" if secondary_features else "",
         ignore_cache=ignore_cache,
+        minimal=True,
     )
 
     types = convert_to_rid_list(variant_types_details)
@@ -676,9 +704,8 @@ def match_positional_variant(
     cat_variant_query(features, types, secondary_features)
 
     if secondary_features:
-        # match single gene fusions for either gene
-        cat_variant_query(features, types, None)
-        cat_variant_query(secondary_features, types, None)
+        # match single gene fusions for either gene (in a single query over both gene lists)
+        cat_variant_query(features + secondary_features, types, None)
 
     # Adding back generic PositionalVariant to the matches
     if filtered_similarAndGeneric:
@@ -698,4 +725,6 @@ def match_positional_variant(
     for row in matches:
         result[row["@rid"]] = cast(Variant, row)
 
+    if use_match_cache:
+        conn.cache[cache_key] = list(result.values())
     return list(result.values())
@@ -1,4 +1,5 @@
-from typing import List, cast
+from itertools import islice
+from typing import Iterable, Iterator, List, Set, cast
 
 from . import GraphKBConnection
 from .constants import FAILED_REVIEW_STATUS, RELEVANCE_BASE_TERMS, STATEMENT_RETURN_PROPERTIES
@@ -45,3 +46,36 @@ def get_statements_from_variants(
     if not failed_review:
         statements = [s for s in statements if s.get("reviewStatus") != FAILED_REVIEW_STATUS]
     return [cast(Statement, s) for s in statements]
+
+
+def iter_statements_from_variants(
+    graphkb_conn: GraphKBConnection,
+    variants: Iterable[Variant],
+    failed_review: bool = False,
+    chunk_size: int = 500,
+) -> Iterator[Statement]:
+    """Lazily fetch the statements related to some variant records, a chunk of variants at a time.
+
+    Statements are yielded as soon as their chunk has been fetched so that the variants can be
+    produced by another generator (ex. one matching variant strings as it goes). Statements
+    related to variants in more than one chunk are only yielded once.
+
+    Args:
+        graphkb_conn (GraphKBConnection): the graphkb api connection object
+        variants (iterable.<dict>): variant records. (Have @rid property.)
+        failed_review (bool): Include statements that failed review
+        chunk_size (int): the number of variants to query statements for per request
+
+    Returns:
+        iterator.<dict>: Statement records from graphkb
+    """
+    seen: Set[str] = set()
+    variants = iter(variants)
+    while True:
+        chunk = list(islice(variants, chunk_size))
+        if not chunk:
+            break
+        for statement in get_statements_from_variants(graphkb_conn, chunk, failed_review):
+            if statement["@rid"] not in seen:
+                seen.add(statement["@rid"])
+                yield statement
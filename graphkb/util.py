@@ -1,7 +1,12 @@
+import base64
+import gzip
 import hashlib
 import json
 import logging
+import os
 import re
+import tempfile
+import threading
 import time
 from datetime import datetime
 from typing import Any, Dict, Iterable, List, Optional, Union, cast
@@ -10,11 +15,34 @@ import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
-from .constants import DEFAULT_LIMIT, DEFAULT_URL, TYPES_TO_NOTATION, AA_3to1_MAPPING
+from .constants import (
+    AA_3to1_MAPPING,
+    DEFAULT_LIMIT,
+    DEFAULT_URL,
+    MAX_CONCURRENT_REQUESTS,
+    MIN_COMPRESSED_REQUEST_SIZE,
+    TYPES_TO_NOTATION,
+)
 from .types import OntologyTerm, ParsedVariant, PositionalVariant, Record
 
+try:
+    # faster (de)serialization of large request/response bodies when available
+    from orjson import dumps as json_dumps
+    from orjson import loads as json_loads
+except ImportError:
+
+    def json_dumps(obj: Any) -> bytes:  # type: ignore
+        return json.dumps(obj).encode("utf-8")
+
+    def json_loads(obj: Union[bytes, str]) -> Any:  # type: ignore
+        return json.loads(obj)
+
+
 QUERY_CACHE: Dict[Any, Any] = {}
 
+RID_PATTERN = re.compile(r"^#-?\d+:-?\d+$")
+AA_3_LETTER_PATTERN = re.compile(r"[A-Z][a-z][a-z]")
+
 # name the logger after the package to make it simple to disable for packages using this one as a dependency
 # https://stackoverflow.com/questions/11029717/how-do-i-disable-log-messages-from-the-requests-library
 
@@ -38,9 +66,7 @@ class FeatureNotFoundError(Exception):
 
 def looks_like_rid(rid: str) -> bool:
     """Check if an input string looks like a GraphKB ID."""
-    if re.match(r"^#-?\d+:-?\d+$", rid):
-        return True
-    return False
+    return RID_PATTERN.match(rid) is not None
 
 
 def convert_aa_3to1(three_letter_notation: str) -> str:
@@ -53,16 +79,12 @@ def convert_aa_3to1(three_letter_notation: str) -> str:
         result.append(three_letter_notation[: pos + 1])
         three_letter_notation = three_letter_notation[pos + 1 :]
 
-    last_match_end = 0  # exclusive interval [ )
-
-    for match in re.finditer(r"[A-Z][a-z][a-z]", three_letter_notation):
-        # add the in-between string
-        result.append(three_letter_notation[last_match_end : match.start()])
-        text = three_letter_notation[match.start() : match.end()]
-        result.append(AA_3to1_MAPPING.get(text, text))
-        last_match_end = match.end()
-
-    result.append(three_letter_notation[last_match_end:])
+    result.append(
+        AA_3_LETTER_PATTERN.sub(
+            lambda match: AA_3to1_MAPPING.get(match.group(), match.group()),
+            three_letter_notation,
+        )
+    )
     return "".join(result)
 
 
@@ -85,13 +107,23 @@ def millis_interval(start: datetime, end: datetime) -> int:
     return millis
 
 
-def cache_key(request_body) -> str:
-    """Create a cache key for a query request to GraphKB."""
+def cache_key(request_body, endpoint: str = "query") -> str:
+    """Create a cache key for a query (or other idempotent POST) request to GraphKB."""
     body = json.dumps(request_body, sort_keys=True)
-    hash_code = hashlib.md5(f"/query{body}".encode("utf-8")).hexdigest()
+    hash_code = hashlib.md5(f"/{endpoint}{body}".encode("utf-8")).hexdigest()
     return hash_code
 
 
+def get_token_expiry(token: str) -> Optional[float]:
+    """Expiry time (seconds since the epoch) of a JWT auth token, or None if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)  # restore the stripped base64 padding
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
 class GraphKBConnection:
     def __init__(
         self,
@@ -99,29 +131,56 @@ class GraphKBConnection:
         username: str = "",
         password: str = "",
         use_global_cache: bool = True,
+        compress_requests: bool = False,
     ):
         self.http = requests.Session()
+        # connection errors are retried by the manual loops in request() and login() so the
+        # adapter must not retry them as well (its backoff would multiply the wait per attempt)
         retries = Retry(
-            total=100,
-            connect=5,
-            status=5,
-            backoff_factor=5,
+            connect=0,
+            status=3,
+            backoff_factor=0.5,
             status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
         )
-        self.http.mount("https://", HTTPAdapter(max_retries=retries))
+        adapter = HTTPAdapter(
+            max_retries=retries,
+            pool_connections=MAX_CONCURRENT_REQUESTS,
+            pool_maxsize=MAX_CONCURRENT_REQUESTS,
+        )
+        # keep-alive connections are re-used across requests for either scheme
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
 
         self.token = ""
+        self.token_expiry: Optional[float] = None
         self.url = url
         self.username = username
         self.password = password
         self.headers = {"Accept": "application/json", "Content-Type": "application/json"}
         self.cache: Dict[Any, Any] = {} if not use_global_cache else QUERY_CACHE
+        self.compress_requests = compress_requests
         self.request_count = 0
         self.first_request: Optional[datetime] = None
         self.last_request: Optional[datetime] = None
+        # the connection may be shared by threads making concurrent requests (ex. get_term_tree)
+        self._stats_lock = threading.Lock()
+        self._login_lock = threading.RLock()
         if username and password:
             self.login(username=username, password=password)
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # locks cannot be pickled or copied, each copy gets its own in __setstate__
+        state = self.__dict__.copy()
+        del state["_stats_lock"]
+        del state["_login_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+        self._login_lock = threading.RLock()
+
     @property
     def load(self) -> Optional[float]:
         if self.first_request and self.last_request:
@@ -141,7 +200,6 @@ class GraphKBConnection:
             dict: the json response as a python dict
         """
         url = join_url(self.url, endpoint)
-        self.request_count += 1
         connect_timeout = 7
         read_timeout = 61
 
@@ -151,11 +209,14 @@ class GraphKBConnection:
         if endpoint in ["query", "parse"]:
             timeout = (connect_timeout, read_timeout)
 
+        extra_headers = kwargs.pop("headers", {})
         start_time = datetime.now()
 
-        if not self.first_request:
-            self.first_request = start_time
-        self.last_request = start_time
+        with self._stats_lock:
+            self.request_count += 1
+            if not self.first_request:
+                self.first_request = start_time
+            self.last_request = start_time
 
         # using a manual retry as well as using the requests Retry() object because
         # a ConnectionError or OSError might be thrown and we still want to retry in those cases.
@@ -167,13 +228,18 @@ class GraphKBConnection:
                 time.sleep(2)  # wait between retries
             try:
                 self.refresh_login()
-                self.request_count += 1
-                resp = requests.request(
-                    method, url, headers=self.headers, timeout=timeout, **kwargs
+                self._count_request()
+                resp = self.http.request(
+                    method,
+                    url,
+                    headers={**self.headers, **extra_headers},
+                    timeout=timeout,
+                    **kwargs,
                 )
                 if resp.status_code == 401 or resp.status_code == 403:
                     logger.debug(f"/{endpoint} - {resp.status_code} - retrying")
                     # try to re-login if the token expired
+                    self.token_expiry = None
                     continue
                 else:
                     break
@@ -200,26 +266,41 @@ class GraphKBConnection:
 
             raise requests.exceptions.HTTPError(message)
 
-        return resp.json()
+        return json_loads(resp.content)
 
     def post(self, uri: str, data: Dict = {}, **kwargs) -> Dict:
-        """Convenience method for making post requests."""
-        return self.request(uri, method="POST", data=json.dumps(data), **kwargs)
+        """Convenience method for making post requests.
+
+        Large request bodies are gzipped when the connection was created with compress_requests
+        """
+        body = json_dumps(data)
+        if self.compress_requests and len(body) > MIN_COMPRESSED_REQUEST_SIZE:
+            body = gzip.compress(body)
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Encoding": "gzip"}
+        return self.request(uri, method="POST", data=body, **kwargs)
+
+    def _count_request(self) -> None:
+        with self._stats_lock:
+            self.request_count += 1
 
     def login(self, username: str, password: str) -> None:
+        with self._login_lock:
+            self._login(username, password)
+
+    def _login(self, username: str, password: str) -> None:
         self.username = username
         self.password = password
         connect_timeout = 7
         read_timeout = 61
 
-        # use requests package directly to avoid recursion loop on login failure
+        # use the http session directly to avoid recursion loop on login failure
         attempts = range(10)
         for attempt in attempts:
             if attempt > 0:
                 time.sleep(2)  # wait between retries
             try:
-                self.request_count += 1
-                resp = requests.request(
+                self._count_request()
+                resp = self.http.request(
                     url=f"{self.url}/token",
                     method="POST",
                     headers=self.headers,
@@ -235,18 +316,65 @@ class GraphKBConnection:
             except Exception as err2:
                 raise err2
         resp.raise_for_status()
-        content = resp.json()
+        content = json_loads(resp.content)
         self.token = content["kbToken"]
+        self.token_expiry = get_token_expiry(self.token)
         self.headers["Authorization"] = self.token
 
     def refresh_login(self) -> None:
-        self.login(self.username, self.password)
+        """Log in again unless the current token is known to still be valid.
+
+        Threads sharing the connection wait for a single re-login rather than each logging in
+        """
+        with self._login_lock:
+            if self.token and self.token_expiry and time.time() < self.token_expiry - 60:
+                return
+            self.login(self.username, self.password)
 
     def set_cache_data(self, request_body: Dict, result: List[Record]) -> None:
         """Explicitly add a query to the cache."""
         hash_code = cache_key(request_body)
         self.cache[hash_code] = result
 
+    def save_cache(self, filename: str) -> None:
+        """Write the cached query results to a file so they can be re-used by a later run.
+
+        Only the results of individual requests (queries and parsed variants) are saved. Derived
+        results (ex. term sets) are rebuilt from these without any further requests.
+
+        Raises:
+            ValueError: the connection uses the global cache, which may also hold results fetched
+                from other API urls (create the connection with use_global_cache=False)
+        """
+        if self.cache is QUERY_CACHE:
+            raise ValueError(
+                "cannot save the global query cache, it is shared by connections to any API url"
+            )
+        queries = {key: value for key, value in self.cache.items() if isinstance(key, str)}
+        # write to a temporary file first so readers never see a partially written cache
+        fd, temp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(filename)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump({"url": self.url, "queries": queries}, fh)
+            os.replace(temp_filename, filename)
+        except BaseException:
+            os.remove(temp_filename)
+            raise
+
+    def load_cache(self, filename: str) -> None:
+        """Add query results previously written by save_cache to the cache.
+
+        Results saved from a connection to a different API url are ignored.
+        """
+        with open(filename, "r") as fh:
+            content = json.load(fh)
+        if content.get("url") != self.url:
+            logger.debug(f"ignoring query cache {filename} saved for {content.get('url')}")
+            return
+        self.cache.update(content["queries"])
+
     def query(
         self,
         request_body: Dict = {},
@@ -277,11 +405,18 @@ class GraphKBConnection:
             self.cache[hash_code] = result
         return result
 
-    def parse(self, hgvs_string: str, requireFeatures: bool = False) -> ParsedVariant:
-        content = self.post(
-            "parse", data={"content": hgvs_string, "requireFeatures": requireFeatures}
-        )
-        return cast(ParsedVariant, content["result"])
+    def parse(
+        self, hgvs_string: str, requireFeatures: bool = False, ignore_cache: bool = False
+    ) -> ParsedVariant:
+        data = {"content": hgvs_string, "requireFeatures": requireFeatures}
+        hash_code = cache_key(data, endpoint="parse")
+        if not ignore_cache and hash_code in self.cache:
+            return self.cache[hash_code]
+
+        result = cast(ParsedVariant, self.post("parse", data=data)["result"])
+        if not ignore_cache:
+            self.cache[hash_code] = result
+        return result
 
     def get_records_by_id(self, record_ids: List[str]) -> List[Record]:
         if not record_ids:
@@ -291,7 +426,9 @@ class GraphKBConnection:
             raise AssertionError(
                 f"The number of Ids given ({len(record_ids)}) does not match the number of records fetched ({len(result)})"
             )
-        return result
+        # return the records in the same order as the ids given
+        records_by_id = {record["@rid"]: record for record in result}
+        return [records_by_id[record_id] for record_id in record_ids]
 
     def get_record_by_id(self, record_id: str) -> Record:
         result = self.get_records_by_id([record_id])
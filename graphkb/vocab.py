@@ -1,14 +1,34 @@
-from typing import Callable, Dict, Iterable, List, Set, cast
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Set, Tuple, cast
 
 from . import GraphKBConnection
 from .types import Ontology
+from .util import cache_key as query_cache_key
 from .util import convert_to_rid_list
 
+TERM_RETURN_PROPERTIES = ["sourceId", "sourceIdVersion", "deprecated", "name", "@rid"]
+
 
 def query_by_name(ontology_class: str, base_term_name: str) -> Dict:
     return {"target": ontology_class, "filters": {"name": base_term_name}}
 
 
+def get_base_rids(
+    conn: GraphKBConnection, build_base_query: Callable, ontology_class: str, name: str
+) -> List[str]:
+    """Get the record IDs of the terms the base query matches (only the IDs are fetched)."""
+    return convert_to_rid_list(
+        conn.query({"returnProperties": ["@rid"], **build_base_query(ontology_class, name)})
+    )
+
+
+def equivalent_terms_cache_key(
+    base_term_name: str, root_exclude_term: str, ontology_class: str, minimal: bool
+) -> Tuple:
+    return ("equivalent_terms", base_term_name, root_exclude_term, ontology_class, minimal)
+
+
 def get_equivalent_terms(
     conn: GraphKBConnection,
     base_term_name: str,
@@ -16,6 +36,7 @@ def get_equivalent_terms(
     ontology_class: str = "Vocabulary",
     ignore_cache: bool = False,
     build_base_query: Callable = query_by_name,
+    minimal: bool = False,
 ) -> List[Ontology]:
     """
     Get a list of terms equivalent to the current term up to the root term
@@ -23,8 +44,18 @@ def get_equivalent_terms(
     Args:
         base_term_name: the name to get superclasses of
         root_exclude_term: the parent term to exlcude along with all of its parent terms
+        build_base_query: builds the query for the base terms. The result is only cached for the
+                          default (query_by_name), the queries it makes are cached as usual
+        minimal: only return the record ID of each term
     """
-    base_records = convert_to_rid_list(conn.query(build_base_query(ontology_class, base_term_name)))
+    cache_key = equivalent_terms_cache_key(
+        base_term_name, root_exclude_term, ontology_class, minimal
+    )
+    use_cache = not ignore_cache and build_base_query is query_by_name
+    if use_cache and cache_key in conn.cache:
+        return conn.cache[cache_key]
+
+    base_records = get_base_rids(conn, build_base_query, ontology_class, base_term_name)
     if not base_records:
         return []
     base_term_parents = cast(
@@ -34,38 +65,34 @@ def get_equivalent_terms(
                 "target": {"target": base_records, "queryType": "descendants"},
                 "queryType": "similarTo",
                 "treeEdges": [],
-                "returnProperties": ["sourceId", "sourceIdVersion", "deprecated", "name", "@rid"],
+                "returnProperties": ["@rid"] if minimal else TERM_RETURN_PROPERTIES,
             },
             ignore_cache=ignore_cache,
         ),
     )
     if root_exclude_term:
-        root_records = convert_to_rid_list(
-            conn.query(build_base_query(ontology_class, root_exclude_term))
-        )
-        if not root_records:
-            return base_term_parents
-
-        exclude = set(
-            convert_to_rid_list(
-                conn.query(
-                    {
-                        "target": {"target": root_records, "queryType": "descendants"},
-                        "queryType": "similarTo",
-                        "treeEdges": [],
-                        "returnProperties": [
-                            "sourceId",
-                            "sourceIdVersion",
-                            "deprecated",
-                            "name",
-                            "@rid",
-                        ],
-                    },
-                    ignore_cache=ignore_cache,
+        root_records = get_base_rids(conn, build_base_query, ontology_class, root_exclude_term)
+        if root_records:
+            exclude = set(
+                convert_to_rid_list(
+                    conn.query(
+                        {
+                            "target": {"target": root_records, "queryType": "descendants"},
+                            "queryType": "similarTo",
+                            "treeEdges": [],
+                            "returnProperties": ["@rid"],
+                        },
+                        ignore_cache=ignore_cache,
+                    )
                 )
             )
-        )
-        return [term for term in base_term_parents if term["@rid"] not in exclude]
+            terms_by_rid = {term["@rid"]: term for term in base_term_parents}
+            for rid in terms_by_rid.keys() & exclude:
+                del terms_by_rid[rid]
+            base_term_parents = list(terms_by_rid.values())
+
+    if use_cache:
+        conn.cache[cache_key] = base_term_parents
     return base_term_parents
 
 
@@ -77,6 +104,7 @@ def get_term_tree(
     include_superclasses: bool = True,
     ignore_cache: bool = False,
     build_base_query: Callable = query_by_name,
+    minimal: bool = False,
 ) -> List[Ontology]:
     """
     Get terms equivalent to the base term by traversing the subclassOf tree and expanding related
@@ -87,47 +115,91 @@ def get_term_tree(
         base_term_name: the term to use as the base of the subclass tree
         ontology_class: the default class to query. Defaults to 'Vocabulary'
         include_superclasses: when True the query will include superclasses of the current term
+        build_base_query: builds the query for the base terms. The result is only cached for the
+                          default (query_by_name), the queries it makes are cached as usual
+        minimal: only return the record ID of each term
 
     Returns:
         GraphKB records
 
     Note: this must be done in 2 calls to avoid going up and down the tree in a single query (exclude adjacent siblings)
     """
+    cache_key = (
+        "term_tree",
+        base_term_name,
+        root_exclude_term,
+        ontology_class,
+        include_superclasses,
+        minimal,
+    )
+    # a new builder function (ex. a lambda) per call would otherwise add a new entry each time
+    use_cache = not ignore_cache and build_base_query is query_by_name
+    if use_cache and cache_key in conn.cache:
+        return conn.cache[cache_key]
+
     # get all child terms of the subclass tree and disambiguate them
-    base_records = convert_to_rid_list(conn.query(build_base_query(ontology_class, base_term_name)))
+    base_records = get_base_rids(conn, build_base_query, ontology_class, base_term_name)
     if not base_records:
         return []
-    child_terms = cast(
-        List[Ontology],
-        conn.query(
-            {
-                "target": {"target": base_records, "queryType": "ancestors"},
-                "queryType": "similarTo",
-                "treeEdges": [],
-                "returnProperties": ["sourceId", "sourceIdVersion", "deprecated", "name", "@rid"],
-            },
-            ignore_cache=ignore_cache,
-        ),
-    )
-    # get all parent terms of the subclass tree and disambiguate them
-    if include_superclasses:
-        parent_terms = get_equivalent_terms(
-            conn,
-            base_term_name,
-            root_exclude_term=root_exclude_term,
-            ontology_class=ontology_class,
-            ignore_cache=ignore_cache,
-            build_base_query=build_base_query,
+    child_query = {
+        "target": {"target": base_records, "queryType": "ancestors"},
+        "queryType": "similarTo",
+        "treeEdges": [],
+        "returnProperties": ["@rid"] if minimal else TERM_RETURN_PROPERTIES,
+    }
+    parent_terms: List[Ontology] = []
+    # a thread pool is only worth starting when neither query can be answered from the cache
+    fetch_concurrently = include_superclasses and (
+        not use_cache
+        or (
+            query_cache_key(child_query) not in conn.cache
+            and equivalent_terms_cache_key(
+                base_term_name, root_exclude_term, ontology_class, minimal
+            )
+            not in conn.cache
         )
+    )
+    if fetch_concurrently:
+        # the child and parent terms are independent queries so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            child_future = executor.submit(conn.query, child_query, ignore_cache=ignore_cache)
+            # get all parent terms of the subclass tree and disambiguate them
+            parent_future = executor.submit(
+                get_equivalent_terms,
+                conn,
+                base_term_name,
+                root_exclude_term=root_exclude_term,
+                ontology_class=ontology_class,
+                ignore_cache=ignore_cache,
+                build_base_query=build_base_query,
+                minimal=minimal,
+            )
+            child_terms = cast(List[Ontology], child_future.result())
+            parent_terms = parent_future.result()
     else:
-        parent_terms = []
+        child_terms = cast(List[Ontology], conn.query(child_query, ignore_cache=ignore_cache))
+        if include_superclasses:
+            parent_terms = get_equivalent_terms(
+                conn,
+                base_term_name,
+                root_exclude_term=root_exclude_term,
+                ontology_class=ontology_class,
+                ignore_cache=ignore_cache,
+                build_base_query=build_base_query,
+                minimal=minimal,
+            )
 
-    terms = {}
-    # merge the two lists
-    for term in child_terms + parent_terms:
-        terms[term["@rid"]] = term
+    # merge the two lists, dropping duplicate records
+    seen: Set[str] = set()
+    terms: List[Ontology] = []
+    for term in chain(child_terms, parent_terms):
+        if term["@rid"] not in seen:
+            seen.add(term["@rid"])
+            terms.append(term)
 
-    return list(terms.values())
+    if use_cache:
+        conn.cache[cache_key] = terms
+    return terms
 
 
 def get_term_by_name(
@@ -188,7 +260,11 @@ def get_terms_set(
         terms.update(
             convert_to_rid_list(
                 get_term_tree(
-                    graphkb_conn, base_term, include_superclasses=False, ignore_cache=ignore_cache
+                    graphkb_conn,
+                    base_term,
+                    include_superclasses=False,
+                    ignore_cache=ignore_cache,
+                    minimal=True,
                 )
             )
         )
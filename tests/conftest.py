@@ -0,0 +1,49 @@
+import glob
+import os
+
+import pytest
+
+from graphkb import GraphKBConnection
+
+# optional file to replay query/parse results from (and save them to) between test runs
+QUERY_CACHE_FILE = os.environ.get("GRAPHKB_TEST_CACHE")
+CREDENTIALS_MISSING = not (os.environ.get("GRAPHKB_USER") and os.environ.get("GRAPHKB_PASS"))
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "requires_credentials: logs in to the API without using the conn fixture"
+    )
+
+
+def pytest_collection_modifyitems(items):
+    """Skip the tests which need to log in to the API when no credentials were given."""
+    if not CREDENTIALS_MISSING:
+        return
+    skip = pytest.mark.skip(reason="GraphKB credentials (GRAPHKB_USER/GRAPHKB_PASS) not set")
+    for item in items:
+        if "conn" in getattr(item, "fixturenames", ()) or item.get_closest_marker(
+            "requires_credentials"
+        ):
+            item.add_marker(skip)
+
+
+def query_cache_filename(base_filename: str) -> str:
+    """File this process saves its results to, one per pytest-xdist worker."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    return f"{base_filename}.{worker}" if worker else base_filename
+
+
+@pytest.fixture(scope="session")
+def conn() -> GraphKBConnection:
+    # a cache of its own, the global one can not be saved since it is not tied to a single url
+    conn = GraphKBConnection(use_global_cache=False)
+    conn.login(os.environ["GRAPHKB_USER"], os.environ["GRAPHKB_PASS"])
+    if QUERY_CACHE_FILE:
+        # results may have been saved by a single process or by any number of xdist workers
+        for filename in [QUERY_CACHE_FILE, *sorted(glob.glob(f"{QUERY_CACHE_FILE}.gw*"))]:
+            if os.path.exists(filename):
+                conn.load_cache(filename)
+    yield conn
+    if QUERY_CACHE_FILE:
+        conn.save_cache(query_cache_filename(QUERY_CACHE_FILE))
@@ -1,11 +1,19 @@
 """
 Tests here depend on specific data in GraphKB which can change. To avoid this, expected/stable values are chosen
 """
+
+import base64
+import json
 import os
+import time
+from collections import defaultdict
+from itertools import chain
+from unittest.mock import Mock
 
 import pytest
 
-from graphkb import GraphKBConnection
+from graphkb import GraphKBConnection, genes
+from graphkb.constants import DEFAULT_MAX_WORKERS, MAX_CONCURRENT_REQUESTS
 from graphkb.genes import (
     get_cancer_genes,
     get_cancer_predisposition_info,
@@ -27,6 +35,14 @@ CANONICAL_CG = ["alb"]
 CANONICAL_FUSION_GENES = ["alk", "ewsr1", "fli1"]
 CANONICAL_STRUCTURAL_VARIANT_GENES = ["brca1", "dpyd", "pten"]
 CANNONICAL_THERAPY_GENES = ["erbb2", "brca2", "egfr"]
+# genes expected to be related to some statement
+STATEMENT_RELATED_GENES = (
+    *CANONICAL_ONCOGENES,
+    *CANONICAL_TS,
+    *CANONICAL_FUSION_GENES,
+    *CANONICAL_STRUCTURAL_VARIANT_GENES,
+    *CANNONICAL_THERAPY_GENES,
+)
 
 
 PHARMACOGENOMIC_INITIAL_GENES = [
@@ -101,54 +117,56 @@ CANCER_PREDISP_INITIAL_GENES = [
 
 
 @pytest.fixture(scope="module")
-def conn():
-    conn = GraphKBConnection()
-    conn.login(os.environ["GRAPHKB_USER"], os.environ["GRAPHKB_PASS"])
-    return conn
+def oncogenes(conn):
+    return {row["name"] for row in get_oncokb_oncogenes(conn)}
 
 
-def test_oncogene(conn):
-    result = get_oncokb_oncogenes(conn)
-    names = {row["name"] for row in result}
+@pytest.fixture(scope="module")
+def tumour_supressors(conn):
+    return {row["name"] for row in get_oncokb_tumour_supressors(conn)}
+
+
+@pytest.fixture(scope="module")
+def cancer_genes(conn):
+    return {row["name"] for row in get_cancer_genes(conn)}
+
+
+def test_oncogene(oncogenes):
     for gene in CANONICAL_ONCOGENES:
-        assert gene in names
+        assert gene in oncogenes
     for gene in CANONICAL_TS:
-        assert gene not in names
+        assert gene not in oncogenes
     for gene in CANONICAL_CG:
-        assert gene not in names
+        assert gene not in oncogenes
 
 
-def test_tumour_supressors(conn):
-    result = get_oncokb_tumour_supressors(conn)
-    names = {row["name"] for row in result}
+def test_tumour_supressors(tumour_supressors):
     for gene in CANONICAL_TS:
-        assert gene in names
+        assert gene in tumour_supressors
     for gene in CANONICAL_ONCOGENES:
-        assert gene not in names
+        assert gene not in tumour_supressors
     for gene in CANONICAL_CG:
-        assert gene not in names
+        assert gene not in tumour_supressors
 
 
-def test_cancer_genes(conn):
-    result = get_cancer_genes(conn)
-    names = {row["name"] for row in result}
+def test_cancer_genes(cancer_genes):
     for gene in CANONICAL_CG:
-        assert gene in names
+        assert gene in cancer_genes
     for gene in CANONICAL_TS:
-        assert gene not in names
+        assert gene not in cancer_genes
     for gene in CANONICAL_ONCOGENES:
-        assert gene not in names
+        assert gene not in cancer_genes
 
 
 def test_get_pharmacogenomic_info(conn):
     genes, matches = get_pharmacogenomic_info(conn)
+    # many matches share a displayName (ex. DPYD:c.1905+1G>A), only check each one once
+    variant_displays = set(matches.values())
     for gene in PHARMACOGENOMIC_INITIAL_GENES:
         assert gene in genes, f"{gene} not found in get_pharmacogenomic_info"
-        for rid, variant_display in matches.items():
-            if variant_display.startswith(gene):
-                break
-        else:  # no break called
-            assert False, f"No rid found for a pharmacogenomic with {gene}"
+        assert any(
+            variant_display.startswith(gene) for variant_display in variant_displays
+        ), f"No rid found for a pharmacogenomic with {gene}"
 
 
 @pytest.mark.skipif(EXCLUDE_INTEGRATION_TESTS, reason="excluding long running integration tests")
@@ -193,63 +211,103 @@ def test_get_therapeutic_associated_genes(conn):
         len(gene_list) > 500
     ), f"Expected over 500 get_therapeutic_associated_genes but found {len(gene_list)}"
     names = {row["name"] for row in gene_list}
-    for gene in CANNONICAL_THERAPY_GENES + CANONICAL_ONCOGENES + CANONICAL_TS:
+    for gene in chain(CANNONICAL_THERAPY_GENES, CANONICAL_ONCOGENES, CANONICAL_TS):
         assert gene in names, f"{gene} not found by get_therapeutic_associated_genes"
 
 
 @pytest.mark.skipif(EXCLUDE_INTEGRATION_TESTS, reason="excluding long running integration tests")
 def test_get_gene_information(conn):
     gene_info = get_gene_information(
-        conn,
-        CANONICAL_ONCOGENES
-        + CANONICAL_TS
-        + CANONICAL_CG
-        + CANONICAL_FUSION_GENES
-        + CANONICAL_STRUCTURAL_VARIANT_GENES
-        + CANNONICAL_THERAPY_GENES
-        + ["notagenename"],
+        conn, [*STATEMENT_RELATED_GENES, *CANONICAL_CG, "notagenename"]
     )
     assert gene_info
     nongene_flagged = [g["name"] for g in gene_info if g["name"] == "notagenename"]
     assert not nongene_flagged, f"Improper gene category: {nongene_flagged}"
 
+    # names of the genes with each flag set, collected in a single pass
+    flagged = defaultdict(set)
+    for gene_record in gene_info:
+        for flag, value in gene_record.items():
+            if value is True:
+                flagged[flag].add(gene_record["name"])
+
     for gene in CANONICAL_ONCOGENES:
-        assert gene in [
-            g["name"] for g in gene_info if g.get("oncogene")
-        ], f"Missed oncogene {gene}"
+        assert gene in flagged["oncogene"], f"Missed oncogene {gene}"
 
     for gene in CANONICAL_TS:
-        assert gene in [
-            g["name"] for g in gene_info if g.get("tumourSuppressor")
-        ], f"Missed 'tumourSuppressor' {gene}"
+        assert gene in flagged["tumourSuppressor"], f"Missed 'tumourSuppressor' {gene}"
 
     for gene in CANONICAL_FUSION_GENES:
-        assert gene in [
-            g["name"] for g in gene_info if g.get("knownFusionPartner")
-        ], f"Missed knownFusionPartner {gene}"
+        assert gene in flagged["knownFusionPartner"], f"Missed knownFusionPartner {gene}"
 
     for gene in CANONICAL_STRUCTURAL_VARIANT_GENES:
-        assert gene in [
-            g["name"] for g in gene_info if g.get("knownSmallMutation")
-        ], f"Missed knownSmallMutation {gene}"
+        assert gene in flagged["knownSmallMutation"], f"Missed knownSmallMutation {gene}"
 
     for gene in CANNONICAL_THERAPY_GENES:
-        assert gene in [
-            g["name"] for g in gene_info if g.get("therapeuticAssociated")
-        ], f"Missed therapeuticAssociated {gene}"
-
-    for gene in (
-        CANONICAL_ONCOGENES
-        + CANONICAL_TS
-        + CANONICAL_FUSION_GENES
-        + CANONICAL_STRUCTURAL_VARIANT_GENES
-        + CANNONICAL_THERAPY_GENES
-    ):
-        assert gene in [
-            g["name"] for g in gene_info if g.get("kbStatementRelated")
-        ], f"Missed kbStatementRelated {gene}"
+        assert gene in flagged["therapeuticAssociated"], f"Missed therapeuticAssociated {gene}"
+
+    for gene in STATEMENT_RELATED_GENES:
+        assert gene in flagged["kbStatementRelated"], f"Missed kbStatementRelated {gene}"
 
     for gene in CANONICAL_CG:
-        assert gene in [
-            g["name"] for g in gene_info if g.get("cancerGeneListMatch")
-        ], f"Missed cancerGeneListMatch {gene}"
+        assert gene in flagged["cancerGeneListMatch"], f"Missed cancerGeneListMatch {gene}"
+
+
+@pytest.mark.parametrize("max_workers", [DEFAULT_MAX_WORKERS, MAX_CONCURRENT_REQUESTS])
+def test_get_gene_information_concurrent_relogin(monkeypatch, max_workers):
+    """The concurrent equivalent feature lookups share one re-login of an expired token."""
+    token_requests = []
+
+    def fake_request(method, url, **kwargs):
+        if url.endswith("/token"):
+            token_requests.append(url)
+            time.sleep(0.05)  # give the other lookups time to find the token still expired
+            payload = base64.urlsafe_b64encode(json.dumps({"exp": time.time() + 3600}).encode())
+            content = {"kbToken": f"header.{payload.decode().rstrip('=')}.signature"}
+        else:
+            content = {"result": [{"@rid": "#1:0", "conditions": []}]}
+        return Mock(status_code=200, content=json.dumps(content).encode())
+
+    graphkb_conn = GraphKBConnection(use_global_cache=False)
+    graphkb_conn.token = "expired"
+    monkeypatch.setattr(graphkb_conn.http, "request", fake_request)
+    for gene_list in ("get_oncokb_oncogenes", "get_oncokb_tumour_supressors", "get_cancer_genes"):
+        monkeypatch.setattr(genes, gene_list, lambda conn: [{"@rid": "#1:0"}])
+
+    def expire_token(conn):
+        # the token runs out just before the concurrent lookups start
+        conn.token_expiry = time.time() - 1
+        return [{"@rid": "#1:0"}]
+
+    monkeypatch.setattr(genes, "get_therapeutic_associated_genes", expire_token)
+
+    gene_names = [f"gene{i}" for i in range(32)]
+    result = get_gene_information(graphkb_conn, gene_names, max_workers=max_workers)
+    assert sorted(row["name"] for row in result) == sorted(gene_names)
+    # one login for the statement query and a single shared re-login for the lookups
+    assert len(token_requests) == 2
+
+
+def test_get_gene_information_serial(monkeypatch):
+    monkeypatch.setattr(genes, "ThreadPoolExecutor", Mock(side_effect=AssertionError))
+    for gene_list in (
+        "get_oncokb_oncogenes",
+        "get_oncokb_tumour_supressors",
+        "get_cancer_genes",
+        "get_therapeutic_associated_genes",
+    ):
+        monkeypatch.setattr(genes, gene_list, lambda conn: [{"@rid": "#1:0"}])
+    monkeypatch.setattr(
+        genes, "get_equivalent_features", lambda conn, gene_name: [{"@rid": f"#1:{gene_name}"}]
+    )
+    graphkb_conn = Mock(query=Mock(return_value=[]))
+    result = get_gene_information(graphkb_conn, ["1", "0"], max_workers=1)
+    assert result == [
+        {
+            "name": "0",
+            "oncogene": True,
+            "tumourSuppressor": True,
+            "cancerGeneListMatch": True,
+            "therapeuticAssociated": True,
+        }
+    ]
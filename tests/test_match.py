@@ -1,12 +1,13 @@
 import os
 import re
-from typing import List
+from itertools import product
+from typing import Dict, List, Pattern, Set
 from unittest.mock import MagicMock
 
 import pytest
 
 import graphkb
-from graphkb import GraphKBConnection, match
+from graphkb import match
 from graphkb.constants import DEFAULT_NON_STRUCTURAL_VARIANT_TYPE, STRUCTURAL_VARIANT_SIZE_THRESHOLD
 from graphkb.util import FeatureNotFoundError
 
@@ -20,21 +21,47 @@ DECREASE_PREFIXES = ["down", "decrease", "reduce", "under", "loss", "delet"]
 GENERAL_MUTATION = "mutation"
 
 
-def has_prefix(word: str, prefixes: List[str]) -> bool:
-    for prefix in prefixes:
-        if re.search(r"\b" + prefix, word):
-            return True
-    return False
+def prefix_pattern(prefixes: List[str]) -> Pattern:
+    """Compile a pattern matching any word starting with one of the prefixes."""
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, prefixes)) + ")")
 
 
-@pytest.fixture(scope="module")
-def conn() -> GraphKBConnection:
-    conn = GraphKBConnection()
-    conn.login(os.environ["GRAPHKB_USER"], os.environ["GRAPHKB_PASS"])
-    return conn
+INCREASE_RE = prefix_pattern(INCREASE_PREFIXES)
+DECREASE_RE = prefix_pattern(DECREASE_PREFIXES)
 
 
-@pytest.fixture(scope="class")
+def matched_types(matches: List[dict], opposite_re: Pattern) -> Set[str]:
+    """Names of the matched variant types, checking none are general or in the opposite direction."""
+    types_selected = {record["type"]["name"] for record in matches}
+    assert GENERAL_MUTATION not in types_selected
+    for variant_type in types_selected:
+        assert not opposite_re.search(variant_type)
+    return types_selected
+
+
+@pytest.fixture(scope="session")
+def feature_rids(conn) -> Dict[str, str]:
+    """Record ID of a feature for each gene name the tests reference explicitly.
+
+    Keyed by the lowercase gene name, as GraphKB stores feature names in lowercase.
+    """
+    names = ["kras", "bcr", "abl1", "pten"]
+    features = conn.query(
+        {
+            "target": "Feature",
+            "filters": {"name": names, "operator": "IN"},
+            "returnProperties": ["@rid", "name"],
+        }
+    )
+    rids: Dict[str, str] = {}
+    for feature in features:
+        rids.setdefault(feature["name"].lower(), feature["@rid"])
+    missing = [name for name in names if name not in rids]
+    assert not missing, f"no Feature record found for: {missing}"
+    return rids
+
+
+@pytest.fixture(scope="session")
 def kras(conn):
     return [f["displayName"] for f in match.get_equivalent_features(conn, "kras")]
 
@@ -93,76 +120,77 @@ class TestMatchCopyVariant:
         matches = match.match_copy_variant(conn, "CDKN2A", match.INPUT_COPY_CATEGORIES.ANY_LOSS)
         assert matches
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, INCREASE_RE)
         zygositys = {record["zygosity"] for record in matches}
 
         assert match.INPUT_COPY_CATEGORIES.ANY_LOSS in types_selected
         assert match.INPUT_COPY_CATEGORIES.AMP not in types_selected
-        assert GENERAL_MUTATION not in types_selected
 
         assert "homozygous" in zygositys
 
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, INCREASE_PREFIXES)
-
     def test_known_loss_zygosity_filtered(self, conn):
         matches = match.match_copy_variant(
             conn, "CDKN2A", match.INPUT_COPY_CATEGORIES.ANY_LOSS, True
         )
         assert matches
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, INCREASE_RE)
         zygositys = {record["zygosity"] for record in matches}
 
         assert "homozygous" not in zygositys
 
-        assert GENERAL_MUTATION not in types_selected
         assert match.INPUT_COPY_CATEGORIES.ANY_LOSS in types_selected
         assert match.INPUT_COPY_CATEGORIES.AMP not in types_selected
 
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, INCREASE_PREFIXES)
-
     def test_known_gain(self, conn):
         matches = match.match_copy_variant(conn, "KRAS", "copy gain")
         assert matches
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, DECREASE_RE)
 
-        assert GENERAL_MUTATION not in types_selected
         assert match.INPUT_COPY_CATEGORIES.AMP in types_selected
         assert match.INPUT_COPY_CATEGORIES.ANY_LOSS not in types_selected
 
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, DECREASE_PREFIXES)
-
     @pytest.mark.skipif(
         EXCLUDE_INTEGRATION_TESTS, reason="excluding long running integration tests"
     )
     def test_low_gain_excludes_amplification(self, conn):
         matches = match.match_copy_variant(conn, "KRAS", match.INPUT_COPY_CATEGORIES.GAIN)
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, DECREASE_RE)
 
         assert match.INPUT_COPY_CATEGORIES.AMP not in types_selected
         assert match.INPUT_COPY_CATEGORIES.LOSS not in types_selected
-        assert GENERAL_MUTATION not in types_selected
 
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, DECREASE_PREFIXES)
+
+def positions(*values):
+    """Position records for each value, in order."""
+    return tuple({"pos": value} for value in values)
 
 
-@pytest.mark.parametrize("pos1,pos2_start,pos2_end", [[3, 2, 5], [2, None, 5], [3, 2, None]])
-def test_range_overlap(pos1, pos2_start, pos2_end):
-    assert match.positions_overlap({"pos": pos1}, {"pos": pos2_start}, {"pos": pos2_end})
+@pytest.mark.parametrize(
+    "pos,range_start,range_end",
+    [positions(3, 2, 5), positions(2, None, 5), positions(3, 2, None)],
+    ids=["inside", "open start", "open end"],
+)
+def test_range_overlap(pos, range_start, range_end):
+    assert match.positions_overlap(pos, range_start, range_end)
 
 
 @pytest.mark.parametrize(
-    "pos1,pos2_start,pos2_end",
-    [[2, 4, 5], [5, 2, 3], [10, None, 9], [10, 11, None], [1, 2, 2], [2, 1, 1]],
+    "pos,range_start,range_end",
+    [
+        positions(2, 4, 5),
+        positions(5, 2, 3),
+        positions(10, None, 9),
+        positions(10, 11, None),
+        positions(1, 2, 2),
+        positions(2, 1, 1),
+    ],
+    ids=["before", "after", "after open start", "before open end", "before point", "after point"],
 )
-def test_range_not_overlap(pos1, pos2_start, pos2_end):
-    assert not match.positions_overlap({"pos": pos1}, {"pos": pos2_start}, {"pos": pos2_end})
+def test_range_not_overlap(pos, range_start, range_end):
+    assert not match.positions_overlap(pos, range_start, range_end)
 
 
 @pytest.mark.parametrize("pos1", [None, 1])
@@ -191,28 +219,19 @@ class TestMatchExpressionVariant:
         )
         assert matches
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, INCREASE_RE)
 
         assert match.INPUT_EXPRESSION_CATEGORIES.UP not in types_selected
-        assert GENERAL_MUTATION not in types_selected
-
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, INCREASE_PREFIXES)
 
-    def test_known_reduced_expression_gene_id(self, conn):
-        gene_id = conn.query({"target": "Feature", "filters": [{"name": "PTEN"}]})[0]["@rid"]
+    def test_known_reduced_expression_gene_id(self, conn, feature_rids):
         matches = match.match_expression_variant(
-            conn, gene_id, match.INPUT_EXPRESSION_CATEGORIES.DOWN
+            conn, feature_rids["pten"], match.INPUT_EXPRESSION_CATEGORIES.DOWN
         )
         assert matches
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, INCREASE_RE)
 
         assert match.INPUT_EXPRESSION_CATEGORIES.UP not in types_selected
-        assert GENERAL_MUTATION not in types_selected
-
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, INCREASE_PREFIXES)
 
     @pytest.mark.skipif(
         EXCLUDE_INTEGRATION_TESTS, reason="excluding long running integration tests"
@@ -221,92 +240,54 @@ class TestMatchExpressionVariant:
         matches = match.match_expression_variant(conn, "CA9", match.INPUT_EXPRESSION_CATEGORIES.UP)
         assert matches
 
-        types_selected = {record["type"]["name"] for record in matches}
+        types_selected = matched_types(matches, DECREASE_RE)
 
         assert match.INPUT_EXPRESSION_CATEGORIES.UP not in types_selected
-        assert GENERAL_MUTATION not in types_selected
 
-        for variant_type in types_selected:
-            assert not has_prefix(variant_type, DECREASE_PREFIXES)
 
+def pos1_variant(**props) -> dict:
+    """Variant at position 1 with some optional sequence properties."""
+    return {"break1Start": {"pos": 1}, **props}
+
+
+# (variant, reference_variant) pairs which should/should not match at the same position
+MATCHING_SEQUENCES = [
+    # null matches anything
+    (pos1_variant(), pos1_variant()),
+    (pos1_variant(untemplatedSeq="T"), pos1_variant()),
+    (pos1_variant(), pos1_variant(untemplatedSeq="T")),
+    (pos1_variant(refSeq="T"), pos1_variant()),
+    (pos1_variant(), pos1_variant(refSeq="T")),
+    (pos1_variant(untemplatedSeq="R"), pos1_variant(untemplatedSeq="R")),
+    (pos1_variant(refSeq="R"), pos1_variant(refSeq="R")),
+]
+MISMATCHED_SEQUENCES = [
+    # ambiguous sequences must still be the same length
+    (pos1_variant(untemplatedSeq="??"), pos1_variant(untemplatedSeq="T")),
+    (pos1_variant(untemplatedSeq="?"), pos1_variant(untemplatedSeq="TT")),
+    (pos1_variant(refSeq="??"), pos1_variant(refSeq="T")),
+    (pos1_variant(refSeq="?"), pos1_variant(refSeq="TT")),
+    (pos1_variant(untemplatedSeq="M"), pos1_variant(untemplatedSeq="R")),
+    (pos1_variant(refSeq="M"), pos1_variant(refSeq="R")),
+]
 
-class TestComparePositionalVariants:
-    def test_nonspecific_altseq(self):
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}}, {"break1Start": {"pos": 1}}
-        )
-        # null matches anything
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "T"}, {"break1Start": {"pos": 1}}
-        )
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}}, {"break1Start": {"pos": 1}, "untemplatedSeq": "T"}
-        )
-
-    @pytest.mark.parametrize("seq1", ["T", "X", "?"])
-    @pytest.mark.parametrize("seq2", ["T", "X", "?"])
-    def test_ambiguous_altseq(self, seq1, seq2):
-        # ambiguous AA matches anything the same length
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "untemplatedSeq": seq1},
-            {"break1Start": {"pos": 1}, "untemplatedSeq": seq2},
-        )
 
-    def test_altseq_length_mismatch(self):
-        assert not match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "??"},
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "T"},
-        )
-        assert not match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "?"},
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "TT"},
-        )
+class TestComparePositionalVariants:
+    @pytest.mark.parametrize("variant,reference_variant", MATCHING_SEQUENCES)
+    def test_matching_sequences(self, variant, reference_variant):
+        assert match.compare_positional_variants(variant, reference_variant)
 
-    def test_nonspecific_refseq(self):
-        # null matches anything
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "refSeq": "T"}, {"break1Start": {"pos": 1}}
-        )
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}}, {"break1Start": {"pos": 1}, "refSeq": "T"}
-        )
+    @pytest.mark.parametrize("variant,reference_variant", MISMATCHED_SEQUENCES)
+    def test_mismatched_sequences(self, variant, reference_variant):
+        assert not match.compare_positional_variants(variant, reference_variant)
 
+    @pytest.mark.parametrize("seq_property", ["untemplatedSeq", "refSeq"])
     @pytest.mark.parametrize("seq1", ["T", "X", "?"])
     @pytest.mark.parametrize("seq2", ["T", "X", "?"])
-    def test_ambiguous_refseq(self, seq1, seq2):
+    def test_ambiguous_seq(self, seq_property, seq1, seq2):
         # ambiguous AA matches anything the same length
         assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "refSeq": seq1}, {"break1Start": {"pos": 1}, "refSeq": seq2}
-        )
-
-    def test_refseq_length_mismatch(self):
-        assert not match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "refSeq": "??"}, {"break1Start": {"pos": 1}, "refSeq": "T"}
-        )
-        assert not match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "refSeq": "?"}, {"break1Start": {"pos": 1}, "refSeq": "TT"}
-        )
-
-    def test_diff_altseq(self):
-        assert not match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "M"},
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "R"},
-        )
-
-    def test_same_altseq_matches(self):
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "R"},
-            {"break1Start": {"pos": 1}, "untemplatedSeq": "R"},
-        )
-
-    def test_diff_refseq(self):
-        assert not match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "refSeq": "M"}, {"break1Start": {"pos": 1}, "refSeq": "R"}
-        )
-
-    def test_same_refseq_matches(self):
-        assert match.compare_positional_variants(
-            {"break1Start": {"pos": 1}, "refSeq": "R"}, {"break1Start": {"pos": 1}, "refSeq": "R"}
+            pos1_variant(**{seq_property: seq1}), pos1_variant(**{seq_property: seq2})
         )
 
     def test_range_vs_sub(self):
@@ -333,45 +314,42 @@ class TestComparePositionalVariants:
 
 
 class TestMatchPositionalVariant:
-    def test_error_on_duplicate_reference1(self, conn):
-        with pytest.raises(ValueError):
-            match.match_positional_variant(conn, "KRAS:p.G12D", "#123:34")
-
-    def test_error_on_bad_reference2(self, conn):
-        with pytest.raises(ValueError):
-            match.match_positional_variant(conn, "KRAS:p.G12D", reference2="#123:34")
-
-    def test_error_on_duplicate_reference2(self, conn):
-        with pytest.raises(ValueError):
-            match.match_positional_variant(
-                conn, "(BCR,ABL1):fusion(e.13,e.3)", reference2="#123:34"
-            )
-
-    def test_uncertain_position_not_supported(self, conn):
-        with pytest.raises(NotImplementedError):
-            match.match_positional_variant(conn, "(BCR,ABL1):fusion(e.13_24,e.3)")
-
-    def test_bad_gene_name(self, conn):
-        with pytest.raises(FeatureNotFoundError):
-            match.match_positional_variant(conn, "ME-AS-A-GENE:p.G12D")
-
-    def test_bad_gene2_name(self, conn):
-        with pytest.raises(FeatureNotFoundError):
-            match.match_positional_variant(conn, "(BCR,ME-AS-A-GENE):fusion(e.13,e.3)")
+    @pytest.mark.parametrize(
+        "variant_string,kwargs,error",
+        [
+            ["KRAS:p.G12D", {"reference1": "#123:34"}, ValueError],
+            ["KRAS:p.G12D", {"reference2": "#123:34"}, ValueError],
+            ["(BCR,ABL1):fusion(e.13,e.3)", {"reference2": "#123:34"}, ValueError],
+            ["(BCR,ABL1):fusion(e.13_24,e.3)", {}, NotImplementedError],
+            ["ME-AS-A-GENE:p.G12D", {}, FeatureNotFoundError],
+            ["(BCR,ME-AS-A-GENE):fusion(e.13,e.3)", {}, FeatureNotFoundError],
+        ],
+        ids=[
+            "duplicate reference1",
+            "reference2 without reference1",
+            "duplicate reference2",
+            "uncertain position",
+            "bad gene name",
+            "bad gene2 name",
+        ],
+    )
+    def test_invalid_input(self, conn, variant_string, kwargs, error):
+        with pytest.raises(error):
+            match.match_positional_variant(conn, variant_string, **kwargs)
 
-    def test_match_explicit_reference1(self, conn):
-        reference1 = conn.query({"target": "Feature", "filters": {"name": "KRAS"}})[0]["@rid"]
-        matches = match.match_positional_variant(conn, "p.G12D", reference1=reference1)
+    def test_match_explicit_reference1(self, conn, feature_rids):
+        matches = match.match_positional_variant(conn, "p.G12D", reference1=feature_rids["kras"])
         assert matches
 
     @pytest.mark.skipif(
         EXCLUDE_INTEGRATION_TESTS, reason="excluding long running integration tests"
     )
-    def test_match_explicit_references(self, conn):
-        reference1 = conn.query({"target": "Feature", "filters": {"name": "BCR"}})[0]["@rid"]
-        reference2 = conn.query({"target": "Feature", "filters": {"name": "ABL1"}})[0]["@rid"]
+    def test_match_explicit_references(self, conn, feature_rids):
         matches = match.match_positional_variant(
-            conn, "fusion(e.13,e.3)", reference1=reference1, reference2=reference2
+            conn,
+            "fusion(e.13,e.3)",
+            reference1=feature_rids["bcr"],
+            reference2=feature_rids["abl1"],
         )
         assert matches
 
@@ -461,32 +439,30 @@ class TestMatchPositionalVariant:
                 not nonsense
             ), f"Missense {mut} is not a nonsense variant: {((m['displayName'], m['@rid']) for m in nonsense)}"
 
-    def test_structural_variants(self, conn):
+    @pytest.mark.parametrize(
+        "variant_string,expected", structuralVariants.items(), ids=list(structuralVariants)
+    )
+    def test_structural_variants(self, conn, variant_string, expected):
         """KBDEV-1056"""
-        for variant_string, expected in structuralVariants.items():
-            print(variant_string)
-            # Querying matches for variant_string
-            m = match.match_positional_variant(conn, variant_string)
-            MatchingDisplayNames = [el["displayName"] for el in m]
-            MatchingTypes = [el["type"]["name"] for el in m]
-
-            # Match
-            for displayName in expected.get('matches', {}).get("displayName", []):
-                assert displayName in MatchingDisplayNames
-            for type in expected.get('matches', {}).get("type", []):
-                assert type in MatchingTypes
-
-            # Does not match
-            for displayName in MatchingDisplayNames:
-                assert displayName not in expected.get('does_not_matches', {}).get(
-                    "displayName", []
-                )
-            for type in MatchingTypes:
-                assert type not in expected.get('does_not_matches', {}).get("type", [])
+        m = match.match_positional_variant(conn, variant_string)
+        matching_display_names = {el["displayName"] for el in m}
+        matching_types = {el["type"]["name"] for el in m}
+        matches = expected.get("matches", {})
+        does_not_matches = expected.get("does_not_matches", {})
+
+        # Match
+        assert set(matches.get("displayName", [])) <= matching_display_names
+        assert set(matches.get("type", [])) <= matching_types
+
+        # Does not match
+        assert not matching_display_names & set(does_not_matches.get("displayName", []))
+        assert not matching_types & set(does_not_matches.get("type", []))
 
 
 class TestCacheMissingFeatures:
-    def test_filling_cache(self):
+    def test_filling_cache(self, monkeypatch):
+        # use a fresh cache so other tests (possibly in the same worker) are not affected
+        monkeypatch.setattr(match, "FEATURES_CACHE", set())
         mock_conn = MagicMock(
             query=MagicMock(
                 return_value=[
@@ -500,6 +476,66 @@ class TestCacheMissingFeatures:
         assert "alice" in match.FEATURES_CACHE
 
 
+KRAS_G12D_PARSED = {
+    "reference1": "KRAS",
+    "type": "missense",
+    "break1Start": {"@class": "ProteinPosition", "pos": 12},
+}
+
+
+def mock_positional_conn() -> MagicMock:
+    """Connection whose every query returns the same KRAS G12 variant."""
+    mock_conn = MagicMock(cache={})
+    mock_conn.parse.return_value = KRAS_G12D_PARSED
+    mock_conn.query.return_value = [
+        {
+            "@rid": "#1:0",
+            "@class": "PositionalVariant",
+            "break1Start": {"@class": "ProteinPosition", "pos": 12},
+            "type": "#2:0",
+            "reference1": "#3:0",
+            "displayName": "KRAS:p.G12D",
+        }
+    ]
+    return mock_conn
+
+
+class TestPositionalVariantMatchCache:
+    @pytest.mark.parametrize("ignore_cache,match_count", [(False, 1), (True, 2)])
+    def test_repeat_variant(self, ignore_cache, match_count):
+        mock_conn = mock_positional_conn()
+        first = match.match_positional_variant(mock_conn, "KRAS:p.G12D", ignore_cache=ignore_cache)
+        query_count = mock_conn.query.call_count
+        second = match.match_positional_variant(mock_conn, "KRAS:p.G12D", ignore_cache=ignore_cache)
+        assert second == first
+        assert mock_conn.parse.call_count == match_count
+        assert mock_conn.query.call_count == match_count * query_count
+
+    def test_changing_result_keeps_cache(self):
+        mock_conn = mock_positional_conn()
+        match.match_positional_variant(mock_conn, "KRAS:p.G12D").clear()
+        match.match_positional_variant(mock_conn, "KRAS:p.G12D").clear()
+        assert match.match_positional_variant(mock_conn, "KRAS:p.G12D")
+
+    def test_pre_parsed_variant_is_not_memoized(self):
+        mock_conn = mock_positional_conn()
+        match.match_positional_variant(mock_conn, "KRAS:p.G12D")
+        # the same string with a different parse must not be answered from the first call
+        other_parse = {**KRAS_G12D_PARSED, "break1Start": {"@class": "ProteinPosition", "pos": 13}}
+        for _ in range(2):
+            query_count = mock_conn.query.call_count
+            match.match_positional_variant(mock_conn, "KRAS:p.G12D", parsed=other_parse)
+            assert mock_conn.query.call_count > query_count
+        assert mock_conn.parse.call_count == 1
+
+    def test_pre_parsed_variant_is_not_parsed_again(self):
+        mock_conn = MagicMock(cache={})
+        parsed = {"reference1": "KRAS", "break1Start": {"pos": 1}, "break1End": {"pos": 2}}
+        with pytest.raises(NotImplementedError):
+            match.match_positional_variant(mock_conn, "KRAS:p.G(1_2)D", parsed=parsed)
+        mock_conn.parse.assert_not_called()
+
+
 class TestTypeScreening:
     # Types as class variables
     default_type = DEFAULT_NON_STRUCTURAL_VARIANT_TYPE
@@ -572,61 +608,48 @@ class TestTypeScreening:
                     == TestTypeScreening.default_type
                 )
 
-    def test_type_screening_structural_untemplatedSeqSize(self, conn):
-        for type in TestTypeScreening.ambiguous_structural:
-            # Variation length too small (< threshold)
-            assert (
-                match.type_screening(
-                    conn,
-                    {
-                        "type": type,
-                        "untemplatedSeqSize": TestTypeScreening.threshold - 1,
-                    },
-                )
-                == TestTypeScreening.default_type
+    @pytest.mark.parametrize("type_", ambiguous_structural)
+    def test_type_screening_structural_untemplatedSeqSize(self, conn, type_):
+        # Variation length too small (< threshold)
+        assert (
+            match.type_screening(
+                conn, {"type": type_, "untemplatedSeqSize": TestTypeScreening.threshold - 1}
             )
-            # Variation length big enough (>= threshold)
-            assert (
-                match.type_screening(
-                    conn,
-                    {
-                        "type": type,
-                        "untemplatedSeqSize": TestTypeScreening.threshold,
-                    },
-                )
-                == type
+            == TestTypeScreening.default_type
+        )
+        # Variation length big enough (>= threshold)
+        assert (
+            match.type_screening(
+                conn, {"type": type_, "untemplatedSeqSize": TestTypeScreening.threshold}
             )
+            == type_
+        )
 
-    def test_type_screening_structural_positions(self, conn):
-        for type in TestTypeScreening.ambiguous_structural:
-            # Variation length too small (< threshold)
-            for opt in [
-                {"break2Start": {"pos": TestTypeScreening.threshold - 1}},
-                {"break2Start": {"pos": TestTypeScreening.threshold - 1}, "prefix": "c"},
-                {"break2Start": {"pos": TestTypeScreening.threshold - 1}, "prefix": "g"},
-                {"break2Start": {"pos": TestTypeScreening.threshold - 1}, "prefix": "n"},
-                {"break2Start": {"pos": TestTypeScreening.threshold - 1}, "prefix": "r"},
-                {"break2Start": {"pos": int(TestTypeScreening.threshold / 3) - 1}, "prefix": "p"},
-                {
-                    "break1Start": {"pos": 1 + 99},
-                    "break2Start": {"pos": TestTypeScreening.threshold + 99 - 1},
-                },
-            ]:
-                assert (
-                    match.type_screening(conn, {"type": type, **opt})
-                    == TestTypeScreening.default_type
-                )
-            # Variation length big enough (>= threshold)
-            for opt in [
-                {"break2Start": {"pos": TestTypeScreening.threshold}},
-                {"break2Start": {"pos": TestTypeScreening.threshold}, "prefix": "c"},
-                {"break2Start": {"pos": TestTypeScreening.threshold}, "prefix": "g"},
-                {"break2Start": {"pos": TestTypeScreening.threshold}, "prefix": "n"},
-                {"break2Start": {"pos": TestTypeScreening.threshold}, "prefix": "r"},
-                {"break2Start": {"pos": int(TestTypeScreening.threshold / 3) + 1}, "prefix": "p"},
-                {
-                    "break1Start": {"pos": 1 + 99},
-                    "break2Start": {"pos": TestTypeScreening.threshold + 99},
-                },
-            ]:
-                assert match.type_screening(conn, {"type": type, **opt}) == type
+    # Variation length too small (< threshold)
+    small_positions = [
+        {"break2Start": {"pos": threshold - 1}},
+        {"break2Start": {"pos": threshold - 1}, "prefix": "c"},
+        {"break2Start": {"pos": threshold - 1}, "prefix": "g"},
+        {"break2Start": {"pos": threshold - 1}, "prefix": "n"},
+        {"break2Start": {"pos": threshold - 1}, "prefix": "r"},
+        {"break2Start": {"pos": int(threshold / 3) - 1}, "prefix": "p"},
+        {"break1Start": {"pos": 1 + 99}, "break2Start": {"pos": threshold + 99 - 1}},
+    ]
+    # Variation length big enough (>= threshold)
+    large_positions = [
+        {"break2Start": {"pos": threshold}},
+        {"break2Start": {"pos": threshold}, "prefix": "c"},
+        {"break2Start": {"pos": threshold}, "prefix": "g"},
+        {"break2Start": {"pos": threshold}, "prefix": "n"},
+        {"break2Start": {"pos": threshold}, "prefix": "r"},
+        {"break2Start": {"pos": int(threshold / 3) + 1}, "prefix": "p"},
+        {"break1Start": {"pos": 1 + 99}, "break2Start": {"pos": threshold + 99}},
+    ]
+
+    @pytest.mark.parametrize("type_,opt", list(product(ambiguous_structural, small_positions)))
+    def test_type_screening_structural_small_positions(self, conn, type_, opt):
+        assert match.type_screening(conn, {"type": type_, **opt}) == TestTypeScreening.default_type
+
+    @pytest.mark.parametrize("type_,opt", list(product(ambiguous_structural, large_positions)))
+    def test_type_screening_structural_large_positions(self, conn, type_, opt):
+        assert match.type_screening(conn, {"type": type_, **opt}) == type_
@@ -5,74 +5,58 @@ import pytest
 
 from graphkb import statement
 
-from .test_match import (  # noqa - 'F401 imported but unused' is being fooled by pytest conventions
-    conn,
-)
-
 EXCLUDE_INTEGRATION_TESTS = os.environ.get("EXCLUDE_INTEGRATION_TESTS") == "1"
 
 
-@pytest.fixture()
-def graphkb_conn():
-    def make_rid_list(*values):
-        return [{"@rid": v} for v in values]
-
-    def term_tree_calls(*final_values):
-        # this function makes 2 calls to conn.query here
-        sets = [["fake"], final_values]
-        return [make_rid_list(*s) for s in sets]
-
-    return_values = [
-        *term_tree_calls("1"),  # therapeutic
-        *term_tree_calls("2"),  # therapeutic (2nd base term)
-        *term_tree_calls("3"),  # diagnostic
-        *term_tree_calls("4"),  # prognostic
-        *term_tree_calls("5"),  # pharmacogenomic ['metabolism']
-        *term_tree_calls("6"),  # pharmacogenomic ['toxicity']
-        *term_tree_calls("7"),  # pharmacogenomic ['dosage']
-        *term_tree_calls("8"),  # cancer predisposition
-        *term_tree_calls(),  # biological
-        *term_tree_calls(),  # biological (2nd base term)
-        *term_tree_calls(),  # biological (3rd base term)
-    ]
-
-    query_mock = Mock()
-    query_mock.side_effect = return_values
-    return Mock(query=query_mock, cache={})
-
+def make_rid_list(*values):
+    return [{"@rid": v} for v in values]
 
-class TestCategorizeRelevance:
-    def test_default_categories(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "1")
-        assert category == "therapeutic"
 
-    def test_first_match_returns(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "2")
-        assert category == "therapeutic"
+def term_tree_calls(*final_values):
+    # this function makes 2 calls to conn.query here
+    sets = [["fake"], final_values]
+    return [make_rid_list(*s) for s in sets]
 
-    def test_second_category(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "3")
-        assert category == "diagnostic"
 
-    def test_third_category(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "4")
-        assert category == "prognostic"
+CATEGORY_QUERY_RESULTS = (
+    *term_tree_calls("1"),  # therapeutic
+    *term_tree_calls("2"),  # therapeutic (2nd base term)
+    *term_tree_calls("3"),  # diagnostic
+    *term_tree_calls("4"),  # prognostic
+    *term_tree_calls("5"),  # pharmacogenomic ['metabolism']
+    *term_tree_calls("6"),  # pharmacogenomic ['toxicity']
+    *term_tree_calls("7"),  # pharmacogenomic ['dosage']
+    *term_tree_calls("8"),  # cancer predisposition
+    *term_tree_calls(),  # biological
+    *term_tree_calls(),  # biological (2nd base term)
+    *term_tree_calls(),  # biological (3rd base term)
+)
 
-    def test_fourth_category(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "5")
-        assert category == "pharmacogenomic"
 
-    def test_fifth_category(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "6")
-        assert category == "pharmacogenomic"
+@pytest.fixture()
+def graphkb_conn():
+    # the side effect is consumed by each test so hand out a fresh iterator of the shared results
+    query_mock = Mock()
+    query_mock.side_effect = iter(CATEGORY_QUERY_RESULTS)
+    return Mock(query=query_mock, cache={})
 
-    def test_predisposition_category(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "8")
-        assert category == "cancer predisposition"
 
-    def test_no_match(self, graphkb_conn):
-        category = statement.categorize_relevance(graphkb_conn, "x")
-        assert category == ""
+class TestCategorizeRelevance:
+    @pytest.mark.parametrize(
+        "rid,expected",
+        [
+            pytest.param("1", "therapeutic", id="default"),
+            pytest.param("2", "therapeutic", id="first match returns"),
+            pytest.param("3", "diagnostic", id="second category"),
+            pytest.param("4", "prognostic", id="third category"),
+            pytest.param("5", "pharmacogenomic", id="fourth category"),
+            pytest.param("6", "pharmacogenomic", id="fifth category"),
+            pytest.param("8", "cancer predisposition", id="predisposition category"),
+            pytest.param("x", "", id="no match"),
+        ],
+    )
+    def test_default_categories(self, graphkb_conn, rid, expected):
+        assert statement.categorize_relevance(graphkb_conn, rid) == expected
 
     def test_custom_categories(self, graphkb_conn):
         category = statement.categorize_relevance(
@@ -92,3 +76,16 @@ class TestStatementMatch:
         variant = {"@class": "CategoryVariant", "@rid": "#161:429", "displayName": "RB1 truncating"}
         statements = statement.get_statements_from_variants(conn, [variant])
         assert statements
+
+
+class TestIterStatementsFromVariants:
+    def test_queries_in_chunks(self):
+        query_mock = Mock(side_effect=[[{"@rid": "#10:1"}, {"@rid": "#10:2"}], [{"@rid": "#10:2"}]])
+        variants = ({"@rid": f"#1:{i}"} for i in range(3))
+        statements = statement.iter_statements_from_variants(
+            Mock(query=query_mock), variants, chunk_size=2
+        )
+        assert [s["@rid"] for s in statements] == ["#10:1", "#10:2"]
+        assert query_mock.call_count == 2
+        assert query_mock.call_args_list[0][0][0]["filters"]["conditions"] == ["#1:0", "#1:1"]
+        assert query_mock.call_args_list[1][0][0]["filters"]["conditions"] == ["#1:2"]
@@ -1,6 +1,14 @@
-import os
+import base64
+import copy
+import gzip
+import json
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import pytest
+import requests
 
 from graphkb import GraphKBConnection, util
 
@@ -12,11 +20,162 @@ class OntologyTerm:
         self.displayName = displayName
 
 
-@pytest.fixture(scope="module")
-def conn() -> GraphKBConnection:
-    conn = GraphKBConnection()
-    conn.login(os.environ["GRAPHKB_USER"], os.environ["GRAPHKB_PASS"])
-    return conn
+def make_token(payload: dict) -> str:
+    body = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+    return f"header.{body}.signature"
+
+
+class TestTokenExpiry:
+    def test_reads_exp(self):
+        assert util.get_token_expiry(make_token({"exp": 1234})) == 1234
+
+    @pytest.mark.parametrize("token", ["", "not-a-jwt", make_token({"user": "bob"})])
+    def test_unreadable(self, token):
+        assert util.get_token_expiry(token) is None
+
+    @mock.patch("graphkb.GraphKBConnection.login")
+    def test_refresh_skipped_for_valid_token(self, login):
+        graphkb_conn = GraphKBConnection()
+        graphkb_conn.token = make_token({"exp": time.time() + 3600})
+        graphkb_conn.token_expiry = util.get_token_expiry(graphkb_conn.token)
+        graphkb_conn.refresh_login()
+        assert not login.called
+
+    @mock.patch("graphkb.GraphKBConnection.login")
+    def test_refresh_expired_token(self, login):
+        graphkb_conn = GraphKBConnection()
+        graphkb_conn.token = make_token({"exp": time.time() - 1})
+        graphkb_conn.token_expiry = util.get_token_expiry(graphkb_conn.token)
+        graphkb_conn.refresh_login()
+        assert login.called
+
+    @mock.patch("graphkb.GraphKBConnection.login")
+    def test_concurrent_refresh_logs_in_once(self, login):
+        graphkb_conn = GraphKBConnection()
+
+        def slow_login(username, password):
+            time.sleep(0.05)
+            graphkb_conn.token = make_token({"exp": time.time() + 3600})
+            graphkb_conn.token_expiry = util.get_token_expiry(graphkb_conn.token)
+
+        login.side_effect = slow_login
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: graphkb_conn.refresh_login(), range(8)))
+        assert login.call_count == 1
+
+
+class TestCopyConnection:
+    def test_pickle(self):
+        graphkb_conn = GraphKBConnection(use_global_cache=False)
+        graphkb_conn.set_cache_data({"target": "Vocabulary"}, [{"@rid": "#1:0"}])
+        other_conn = pickle.loads(pickle.dumps(graphkb_conn))
+        assert other_conn.cache == graphkb_conn.cache
+        assert other_conn._login_lock is not graphkb_conn._login_lock
+        with other_conn._login_lock:
+            other_conn._count_request()
+        assert other_conn.request_count == 1
+
+    def test_deepcopy(self):
+        graphkb_conn = GraphKBConnection(use_global_cache=False)
+        other_conn = copy.deepcopy(graphkb_conn)
+        assert other_conn._stats_lock is not graphkb_conn._stats_lock
+        other_conn._count_request()
+        assert other_conn.request_count == 1
+        assert graphkb_conn.request_count == 0
+
+
+class TestCompressRequests:
+    @mock.patch("graphkb.GraphKBConnection.request")
+    def test_large_body_compressed(self, request):
+        graphkb_conn = GraphKBConnection(compress_requests=True)
+        data = {"target": [f"#1:{i}" for i in range(1000)]}
+        graphkb_conn.post("query", data=data)
+        kwargs = request.call_args[1]
+        assert kwargs["headers"] == {"Content-Encoding": "gzip"}
+        assert json.loads(gzip.decompress(kwargs["data"])) == data
+
+    @mock.patch("graphkb.GraphKBConnection.request")
+    def test_small_body_not_compressed(self, request):
+        graphkb_conn = GraphKBConnection(compress_requests=True)
+        graphkb_conn.post("query", data={"target": "Vocabulary"})
+        kwargs = request.call_args[1]
+        assert "headers" not in kwargs
+        assert json.loads(kwargs["data"]) == {"target": "Vocabulary"}
+
+
+class TestRequestRetries:
+    @mock.patch("time.sleep")
+    @mock.patch("graphkb.GraphKBConnection.refresh_login")
+    def test_connection_errors_only_retried_by_request(self, refresh_login, sleep):
+        # nothing listens on the discard port so every connection attempt is refused
+        graphkb_conn = GraphKBConnection(url="http://127.0.0.1:9", use_global_cache=False)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            graphkb_conn.request("query", method="POST", data="{}")
+        # the adapter does not back off between connection attempts of its own
+        assert sleep.call_args_list == [mock.call(2)] * 14
+
+
+class TestGetRecordsById:
+    @mock.patch("graphkb.GraphKBConnection.query")
+    def test_keeps_input_order(self, query):
+        query.return_value = [{"@rid": "#1:1"}, {"@rid": "#1:0"}]
+        records = GraphKBConnection().get_records_by_id(["#1:0", "#1:1"])
+        assert records == [{"@rid": "#1:0"}, {"@rid": "#1:1"}]
+        query.assert_called_once_with({"target": ["#1:0", "#1:1"]})
+
+
+@pytest.mark.parametrize("ignore_cache,post_count", [(False, 1), (True, 2)])
+@mock.patch("graphkb.GraphKBConnection.post")
+def test_repeat_parse(post, ignore_cache, post_count):
+    post.return_value = {"result": {"type": "substitution"}}
+    graphkb_conn = GraphKBConnection(use_global_cache=False)
+    for _ in range(2):
+        parsed = graphkb_conn.parse("KRAS:p.G12D", ignore_cache=ignore_cache)
+        assert parsed == {"type": "substitution"}
+    assert post.call_count == post_count
+
+
+class TestPersistentCache:
+    def test_round_trip(self, tmp_path):
+        filename = str(tmp_path / "cache.json")
+        graphkb_conn = GraphKBConnection(use_global_cache=False)
+        graphkb_conn.set_cache_data({"target": "Vocabulary"}, [{"@rid": "#1:0"}])
+        graphkb_conn.cache[("some", "derived", "key")] = {"#1:0"}
+        graphkb_conn.save_cache(filename)
+
+        other_conn = GraphKBConnection(use_global_cache=False)
+        other_conn.load_cache(filename)
+        assert other_conn.cache == {util.cache_key({"target": "Vocabulary"}): [{"@rid": "#1:0"}]}
+
+    def test_failed_save_keeps_previous_file(self, tmp_path):
+        filename = str(tmp_path / "cache.json")
+        graphkb_conn = GraphKBConnection(use_global_cache=False)
+        graphkb_conn.set_cache_data({"target": "Vocabulary"}, [{"@rid": "#1:0"}])
+        graphkb_conn.save_cache(filename)
+
+        graphkb_conn.cache["not serializable"] = {"#1:0"}
+        with pytest.raises(TypeError):
+            graphkb_conn.save_cache(filename)
+        assert [path.name for path in tmp_path.iterdir()] == ["cache.json"]
+
+        other_conn = GraphKBConnection(use_global_cache=False)
+        other_conn.load_cache(filename)
+        assert other_conn.cache == {util.cache_key({"target": "Vocabulary"}): [{"@rid": "#1:0"}]}
+
+    def test_refuses_global_cache(self, tmp_path):
+        with pytest.raises(ValueError):
+            GraphKBConnection().save_cache(str(tmp_path / "cache.json"))
+        assert not list(tmp_path.iterdir())
+
+    def test_ignores_other_url(self, tmp_path):
+        filename = str(tmp_path / "cache.json")
+        graphkb_conn = GraphKBConnection(url="http://localhost/api", use_global_cache=False)
+        graphkb_conn.set_cache_data({"target": "Vocabulary"}, [{"@rid": "#1:0"}])
+        graphkb_conn.save_cache(filename)
+
+        other_conn = GraphKBConnection(use_global_cache=False)
+        other_conn.load_cache(filename)
+        assert not other_conn.cache
 
 
 class TestLooksLikeRid:
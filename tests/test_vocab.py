@@ -1,7 +1,9 @@
 """
 Tests here depend on specific data in GraphKB which can change. To avoid this, expected/stable values are chosen
 """
-import os
+from functools import partial
+from unittest import mock
+from unittest.mock import Mock
 
 import pytest
 
@@ -12,13 +14,6 @@ BASE_INCREASED_EXPRESSION = "increased expression"
 BASE_REDUCED_EXPRESSION = "reduced expression"
 
 
-@pytest.fixture(scope="module")
-def conn():
-    conn = GraphKBConnection()
-    conn.login(os.environ["GRAPHKB_USER"], os.environ["GRAPHKB_PASS"])
-    return conn
-
-
 def test_expression_vocabulary(conn):
     result = vocab.get_term_tree(conn, BASE_EXPRESSION)
 
@@ -83,3 +78,44 @@ def test_get_terms_set(conn):
     more_terms = vocab.get_terms_set(conn, ["copy variant", "expression variant"])
     assert more_terms
     assert len(more_terms) > len(terms)
+
+
+class TestTermCache:
+    @pytest.mark.parametrize("ignore_cache,query_count", [(False, 2), (True, 4)])
+    @pytest.mark.parametrize(
+        "get_terms",
+        [vocab.get_equivalent_terms, partial(vocab.get_term_tree, include_superclasses=False)],
+        ids=["equivalent terms", "term tree"],
+    )
+    def test_repeat_call(self, get_terms, ignore_cache, query_count):
+        query_mock = Mock(
+            side_effect=[[{"@rid": "#1:0"}], [{"@rid": "#1:0"}, {"@rid": "#1:1"}]] * 2
+        )
+        graphkb_conn = Mock(query=query_mock, cache={})
+
+        first = get_terms(graphkb_conn, "fake", ignore_cache=ignore_cache)
+        second = get_terms(graphkb_conn, "fake", ignore_cache=ignore_cache)
+        assert first == second == [{"@rid": "#1:0"}, {"@rid": "#1:1"}]
+        assert query_mock.call_count == query_count
+        assert bool(graphkb_conn.cache) is not ignore_cache
+
+    def test_cached_queries_skip_thread_pool(self, monkeypatch):
+        graphkb_conn = GraphKBConnection(use_global_cache=False)
+        with mock.patch.object(graphkb_conn, "post", return_value={"result": [{"@rid": "#1:0"}]}):
+            # fill the cache for the child and parent queries of the full tree
+            vocab.get_term_tree(graphkb_conn, "fake", include_superclasses=False)
+            vocab.get_equivalent_terms(graphkb_conn, "fake")
+            monkeypatch.setattr(vocab, "ThreadPoolExecutor", Mock(side_effect=AssertionError))
+            assert vocab.get_term_tree(graphkb_conn, "fake") == [{"@rid": "#1:0"}]
+
+    def test_custom_base_query_not_memoized(self):
+        query_mock = Mock(return_value=[{"@rid": "#1:0"}])
+        graphkb_conn = Mock(query=query_mock, cache={})
+
+        for _ in range(2):
+            vocab.get_term_tree(
+                graphkb_conn,
+                "fake",
+                build_base_query=lambda ontology_class, name: {"target": ontology_class},
+            )
+        assert not graphkb_conn.cache